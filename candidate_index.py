@@ -0,0 +1,190 @@
+import itertools
+import re
+import threading
+import time
+
+from flyer_cache import expiry_time
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+def tokenize(text):
+    """Split text into lower-case word and number tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def candidate_key(candidate):
+    """Return the key that identifies the same item returned by several queries"""
+    return (candidate.name, candidate.merchant, candidate.flyer_id, candidate.price)
+
+class CandidateIndex:
+    """Inverted index over the candidate names fetched for each postal code.
+
+    A query is covered when the same query, or a more general one whose
+    terms are a subset of its terms, has already been sent to the backend
+    for the postal code. Covered queries are answered locally with the held
+    candidates whose names contain all of the query terms that appear in
+    candidate names. Terms such as categories or quantities that never
+    appear in names do not filter. Queries that are not covered, or whose
+    local answer is empty, still go to the backend.
+
+    Candidates and fetched queries expire like the flyer cache: at their
+    earliest valid_to, and never later than ttl seconds after they were
+    fetched. Expired entries are removed on the next add or lookup, along
+    with postal codes left empty. Each postal code holds at most
+    max_candidates candidates. When an add goes past that, the oldest
+    candidates are evicted down to half the cap, along with the fetched
+    queries whose results were evicted. At most max_postal_codes postal
+    codes are held, and the least recently added one is dropped first.
+    """
+
+    def __init__(self, ttl, max_candidates, max_postal_codes=100):
+        self.ttl = ttl
+        self.max_candidates = max_candidates
+        self.max_postal_codes = max_postal_codes
+        self.sequence = itertools.count()
+        # postal code -> {'candidates': {id: (candidate, seq, expires_at)}, 'keys': {key: id},
+        #                 'postings': {token: {id}}, 'queries': {terms: (seq, expires_at)},
+        #                 'next_expiry': earliest expires_at held}
+        # in order of the last add
+        self.postal_codes = {}
+        # Earliest expires_at held for any postal code
+        self.next_expiry = float('inf')
+        self.lookups = 0
+        self.local_hits = 0
+        self.fetches = 0
+        self.fetch_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, postal_code, query, candidates, fetch_seconds=None):
+        """Index the candidates returned for a query sent to the backend"""
+        with self.lock:
+            now = time.time()
+            self._prune_expired(now)
+
+            # Keep postal codes in order of their last add, so the oldest is dropped first
+            index = self.postal_codes.pop(postal_code, None)
+            if index is None:
+                index = {'candidates': {}, 'keys': {}, 'postings': {}, 'queries': {}, 'next_expiry': float('inf')}
+            self.postal_codes[postal_code] = index
+            while len(self.postal_codes) > self.max_postal_codes:
+                del self.postal_codes[next(iter(self.postal_codes))]
+
+            seq = next(self.sequence)
+            latest = now + self.ttl
+            query_expires_at = latest
+
+            for candidate in candidates:
+                expires_at = expiry_time(candidate.valid_to, latest)
+                query_expires_at = min(query_expires_at, expires_at)
+
+                # The same item is often returned by several queries; index it once
+                # and keep it as long as the most recent query that returned it
+                key = candidate_key(candidate)
+                candidate_id = index['keys'].get(key)
+                if candidate_id is None:
+                    candidate_id = seq, len(index['keys'])
+                    index['keys'][key] = candidate_id
+                    for token in set(tokenize(candidate.name)):
+                        index['postings'].setdefault(token, set()).add(candidate_id)
+                index['candidates'][candidate_id] = (candidate, seq, expires_at)
+
+            index['queries'][frozenset(tokenize(query))] = (seq, query_expires_at)
+            index['next_expiry'] = min(index['next_expiry'], query_expires_at)
+            self.next_expiry = min(self.next_expiry, query_expires_at)
+            if len(index['candidates']) > self.max_candidates:
+                self._evict(index)
+
+            if fetch_seconds is not None:
+                self.fetches += 1
+                self.fetch_seconds += fetch_seconds
+
+    def _remove_candidates(self, index, candidate_ids):
+        for candidate_id in candidate_ids:
+            candidate = index['candidates'].pop(candidate_id)[0]
+            del index['keys'][candidate_key(candidate)]
+            for token in set(tokenize(candidate.name)):
+                postings = index['postings'][token]
+                postings.discard(candidate_id)
+                if not postings:
+                    del index['postings'][token]
+
+    def _evict(self, index):
+        # Drop the oldest candidates down to half the cap, and the fetched
+        # queries that returned any of them, since those are no longer fully
+        # held. A candidate's seq is that of the last query that returned it,
+        # so every query newer than the evicted candidates is still complete.
+        oldest = sorted(index['candidates'], key=lambda candidate_id: index['candidates'][candidate_id][1])
+        evicted = oldest[:len(oldest) - self.max_candidates // 2]
+        cutoff = index['candidates'][evicted[-1]][1]
+        self._remove_candidates(index, evicted)
+        for terms, (seq, _) in list(index['queries'].items()):
+            if seq <= cutoff:
+                del index['queries'][terms]
+
+    def _prune_expired(self, now):
+        # Remove expired candidates and queries, and postal codes left empty
+        if now < self.next_expiry:
+            return
+        for postal_code, index in list(self.postal_codes.items()):
+            if index['next_expiry'] > now:
+                continue
+            self._remove_candidates(index, [
+                candidate_id for candidate_id, (_, _, expires_at) in index['candidates'].items() if expires_at <= now
+            ])
+            for terms, (_, expires_at) in list(index['queries'].items()):
+                if expires_at <= now:
+                    del index['queries'][terms]
+            if not index['candidates'] and not index['queries']:
+                del self.postal_codes[postal_code]
+                continue
+            index['next_expiry'] = min(
+                [expires_at for _, _, expires_at in index['candidates'].values()] +
+                [expires_at for _, expires_at in index['queries'].values()]
+            )
+        self.next_expiry = min((index['next_expiry'] for index in self.postal_codes.values()), default=float('inf'))
+
+    def drop(self, postal_code):
+        """Forget everything held for a postal code, e.g. when its flyers roll over"""
+        with self.lock:
+            self.postal_codes.pop(postal_code, None)
+
+    def lookup(self, postal_code, query):
+        """Return the held candidates that answer a covered query, or None if it needs the backend"""
+        with self.lock:
+            self.lookups += 1
+            self._prune_expired(time.time())
+            index = self.postal_codes.get(postal_code)
+            tokens = frozenset(tokenize(query))
+            if index is None or not tokens:
+                return None
+
+            # Covered only by the same query or a more general one
+            if not any(terms <= tokens for terms in index['queries']):
+                return None
+
+            name_tokens = [token for token in tokens if token in index['postings']]
+            if not name_tokens:
+                return None
+
+            # Intersect the smallest posting lists first
+            postings = sorted((index['postings'][token] for token in name_tokens), key=len)
+            candidate_ids = set(postings[0])
+            for posting in postings[1:]:
+                candidate_ids &= posting
+            if not candidate_ids:
+                return None
+
+            self.local_hits += 1
+            return [index['candidates'][candidate_id][0] for candidate_id in sorted(candidate_ids)]
+
+    def stats(self):
+        """Return the local reuse rate and the backend time it saved, for logging"""
+        with self.lock:
+            average_fetch = self.fetch_seconds / self.fetches if self.fetches else 0.0
+            return {
+                'lookups': self.lookups,
+                'local_hits': self.local_hits,
+                'reuse_rate': round(self.local_hits / self.lookups, 3) if self.lookups else 0.0,
+                'seconds_saved': round(self.local_hits * average_fetch, 2),
+                'candidates': sum(len(index['candidates']) for index in self.postal_codes.values()),
+                'postal_codes': len(self.postal_codes)
+            }
@@ -1,5 +1,7 @@
 import sqlite3
-import pandas as pd
+
+# pandas is imported inside the loaders that need it, so connecting to the
+# database or creating tables does not pay for its import
 
 # Function to create a connection to the SQLite database
 def create_connection(db_file):
@@ -17,6 +19,8 @@ def create_connection(db_file):
 # Function to clean numeric columns only if they exist
 def clean_numeric_columns(df, columns):
     """Converts columns with numeric values, handles errors by setting invalid values to None"""
+    import pandas as pd
+
     for column in columns:
         if column in df.columns:  # Only clean columns that exist in the DataFrame
             df[column] = pd.to_numeric(df[column], errors='coerce')  # Set invalid parsing to NaN
@@ -122,6 +126,8 @@ def create_tables(conn):
 # Function to load CSV into SQLite database with additional data checks
 def load_csv_to_db(conn, csv_file, table_name):
     """Load a CSV file into a table in the SQLite database"""
+    import pandas as pd
+
     try:
         # Specify dtype where columns have mixed types or large datasets
         dtype_map = {
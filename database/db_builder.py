@@ -2,10 +2,10 @@ import os
 import create_db
 
 # Define the SQLite database file
-DATABASE_FILE = 'food_data.db'
+DATABASE_FILE = os.getenv('DATABASE_FILE', 'food_data.db')
 
-# Define the path to the source CSV files
-CSV_PATH = '/Users/sethrose/Documents/Development/python-projects/food-db/database/source_data'
+# Define the path to the source CSV files (real USDA downloads or generate_synthetic_data.py output)
+CSV_PATH = os.getenv('CSV_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'source_data'))
 
 # List of CSV files and their corresponding table names
 csv_files = {
@@ -0,0 +1,201 @@
+import argparse
+import bisect
+import csv
+import itertools
+import os
+import random
+import time
+
+# Default output directory, the same one db_builder.py reads from
+SOURCE_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'source_data')
+
+# Zipf exponent used for brand and product popularity; higher means more skew
+POPULARITY_SKEW = 1.1
+
+# Number of synthetic brand owners in addition to the well-known ones below
+SYNTHETIC_BRAND_COUNT = 5000
+
+# Well-known brand owners, ranked so the most common brands appear first
+KNOWN_BRAND_OWNERS = [
+    'Walmart Inc.', 'Kraft Heinz Foods Company', 'The Kroger Co.', 'General Mills, Inc.',
+    'Campbell Soup Company', 'Danone US, LLC', 'PepsiCo, Inc.', 'Nestle USA, Inc.',
+    'Conagra Brands, Inc.', 'Kellogg Company', 'Target Stores', 'Tyson Foods, Inc.',
+    'Hormel Foods Corporation', 'Meijer, Inc.', 'Publix Super Markets, Inc.',
+    'Ahold Delhaize', 'Albertsons Companies, Inc.', 'Hy-Vee, Inc.', 'Aldi Inc.', 'Costco Companies Inc.'
+]
+
+# Brand names used on product labels for the well-known owners
+KNOWN_BRAND_NAMES = {
+    'Walmart Inc.': 'Great Value', 'Kraft Heinz Foods Company': 'Kraft', 'The Kroger Co.': 'Kroger',
+    'General Mills, Inc.': 'Cheerios', 'Campbell Soup Company': "Campbell's", 'Danone US, LLC': 'Dannon',
+    'PepsiCo, Inc.': 'Quaker', 'Nestle USA, Inc.': 'Nestle', 'Conagra Brands, Inc.': 'Healthy Choice',
+    'Kellogg Company': "Kellogg's", 'Target Stores': 'Good & Gather', 'Tyson Foods, Inc.': 'Tyson',
+    'Hormel Foods Corporation': 'Hormel', 'Meijer, Inc.': 'Meijer', 'Publix Super Markets, Inc.': 'Publix',
+    'Ahold Delhaize': 'Nature\'s Promise', 'Albertsons Companies, Inc.': 'Signature Select',
+    'Hy-Vee, Inc.': 'Hy-Vee', 'Aldi Inc.': 'Friendly Farms', 'Costco Companies Inc.': 'Kirkland Signature'
+}
+
+# Products by branded food category, ranked so the most common products appear first
+PRODUCTS = [
+    ('Milk, Eggs & Other Dairy', ['whole milk', 'greek yogurt', 'large eggs', 'butter', '2% reduced fat milk', 'sour cream', 'heavy cream']),
+    ('Cheese', ['cheddar cheese', 'mozzarella cheese', 'american cheese slices', 'parmesan cheese', 'cream cheese']),
+    ('Breads & Buns', ['white bread', 'whole wheat bread', 'hamburger buns', 'bagels', 'english muffins']),
+    ('Cereal', ['toasted oat cereal', 'corn flakes', 'granola', 'instant oatmeal', 'frosted wheat']),
+    ('Soups', ['chicken noodle soup', 'tomato soup', 'cream of mushroom soup', 'vegetable beef soup']),
+    ('Fruit & Vegetable Juice', ['orange juice', 'apple juice', 'cranberry juice cocktail', 'lemonade']),
+    ('Snacks', ['potato chips', 'tortilla chips', 'pretzels', 'popcorn', 'cheese crackers']),
+    ('Frozen Dinners & Entrees', ['pepperoni pizza', 'chicken alfredo', 'beef lasagna', 'burrito']),
+    ('Pasta by Shape & Type', ['spaghetti', 'penne', 'macaroni', 'egg noodles']),
+    ('Pickles, Olives, Peppers & Relishes', ['dill pickles', 'black olives', 'sweet relish'])
+]
+
+# Modifiers combined with product names to build descriptions
+DESCRIPTION_MODIFIERS = ['', '', '', 'organic', 'low fat', 'original', 'family size', 'reduced sodium', 'light', 'classic']
+
+# Nutrients as (id, name, unit_name, nutrient_nbr, typical amount per 100 g)
+NUTRIENTS = [
+    (1003, 'Protein', 'G', 203, 8.0),
+    (1004, 'Total lipid (fat)', 'G', 204, 10.0),
+    (1005, 'Carbohydrate, by difference', 'G', 205, 30.0),
+    (1008, 'Energy', 'KCAL', 208, 250.0),
+    (1079, 'Fiber, total dietary', 'G', 291, 2.5),
+    (1087, 'Calcium, Ca', 'MG', 301, 80.0),
+    (1089, 'Iron, Fe', 'MG', 303, 1.5),
+    (1092, 'Potassium, K', 'MG', 306, 200.0),
+    (1093, 'Sodium, Na', 'MG', 307, 400.0),
+    (1104, 'Vitamin A, IU', 'IU', 318, 150.0),
+    (1162, 'Vitamin C, total ascorbic acid', 'MG', 401, 5.0),
+    (1235, 'Sugars, added', 'G', 539, 6.0),
+    (1253, 'Cholesterol', 'MG', 601, 20.0),
+    (1257, 'Fatty acids, total trans', 'G', 605, 0.1),
+    (1258, 'Fatty acids, total saturated', 'G', 606, 3.0),
+    (2000, 'Sugars, total including NLEA', 'G', 269, 10.0)
+]
+
+# The nutrients every label carries; the rest are added per food at random
+REQUIRED_NUTRIENT_COUNT = 9
+
+# Food attributes as (food_attribute_type_id, name, value choices)
+FOOD_ATTRIBUTES = [
+    (1001, 'Nutrient Updated', ['Yes']),
+    (999, 'Organic', ['Yes', 'No']),
+    (1000, 'Common Name', ['milk', 'yogurt', 'bread', 'cereal', 'soup', 'chips'])
+]
+
+# Share of foods that carry at least one attribute row
+ATTRIBUTE_RATE = 0.3
+
+# Measurement units as (id, name)
+MEASURE_UNITS = [
+    (1000, 'cup'), (1001, 'tablespoon'), (1002, 'teaspoon'), (1003, 'liter'), (1004, 'milliliter'),
+    (1005, 'cubic inch'), (1006, 'cubic centimeter'), (1007, 'gallon'), (1008, 'pint'), (1009, 'fl oz'),
+    (1010, 'paired cooked'), (1038, 'piece'), (1043, 'slice'), (1068, 'package'), (9999, 'undetermined')
+]
+
+# Column order of each generated CSV, matching the tables created by create_db.py
+COLUMNS = {
+    'branded_food.csv': ['fdc_id', 'brand_owner', 'brand_name', 'subbrand_name', 'gtin_upc', 'ingredients',
+                         'serving_size', 'serving_size_unit', 'household_serving_fulltext', 'branded_food_category',
+                         'data_source', 'package_weight', 'modified_date', 'available_date', 'market_country',
+                         'discontinued_date'],
+    'food.csv': ['fdc_id', 'data_type', 'description', 'food_category_id', 'publication_date', 'market_country'],
+    'food_nutrient.csv': ['id', 'fdc_id', 'nutrient_id', 'amount'],
+    'food_attribute.csv': ['id', 'fdc_id', 'seq_num', 'food_attribute_type_id', 'name', 'value'],
+    'nutrient.csv': ['id', 'name', 'unit_name', 'nutrient_nbr'],
+    'measure_unit.csv': ['id', 'name']
+}
+
+# First FDC ID used for generated foods, in the range used by branded foods
+FIRST_FDC_ID = 1100000
+
+def zipf_sampler(rng, count):
+    """Return a function that draws an index in range(count) with Zipf-distributed popularity"""
+    cumulative_weights = list(itertools.accumulate(1 / (rank ** POPULARITY_SKEW) for rank in range(1, count + 1)))
+    total = cumulative_weights[-1]
+    return lambda: bisect.bisect_left(cumulative_weights, rng.random() * total)
+
+def build_brands():
+    """Return (brand_owner, brand_name) pairs ranked from most to least common"""
+    brands = [(owner, KNOWN_BRAND_NAMES[owner]) for owner in KNOWN_BRAND_OWNERS]
+    for number in range(1, SYNTHETIC_BRAND_COUNT + 1):
+        brands.append((f"Brand {number} Foods, Inc.", f"Brand {number}"))
+    return brands
+
+def generate(output_path, nutrient_rows, seed):
+    """Write the synthetic USDA FoodData Central CSV files and return the number of foods"""
+    rng = random.Random(seed)
+    os.makedirs(output_path, exist_ok=True)
+
+    brands = build_brands()
+    next_brand = zipf_sampler(rng, len(brands))
+    next_category = zipf_sampler(rng, len(PRODUCTS))
+    product_samplers = [zipf_sampler(rng, len(products)) for _, products in PRODUCTS]
+    optional_nutrients = NUTRIENTS[REQUIRED_NUTRIENT_COUNT:]
+
+    files = {name: open(os.path.join(output_path, name), 'w', newline='') for name in COLUMNS}
+    try:
+        writers = {name: csv.writer(f) for name, f in files.items()}
+        for name, columns in COLUMNS.items():
+            writers[name].writerow(columns)
+
+        writers['nutrient.csv'].writerows(nutrient[:4] for nutrient in NUTRIENTS)
+        writers['measure_unit.csv'].writerows(MEASURE_UNITS)
+
+        food_count = 0
+        nutrient_row_id = 1
+        attribute_row_id = 1
+        while nutrient_row_id <= nutrient_rows:
+            fdc_id = FIRST_FDC_ID + food_count
+            food_count += 1
+
+            brand_owner, brand_name = brands[next_brand()]
+            category_index = next_category()
+            category, products = PRODUCTS[category_index]
+            product = products[product_samplers[category_index]()]
+            modifier = rng.choice(DESCRIPTION_MODIFIERS)
+            description = ' '.join(part for part in [brand_name, modifier, product] if part).upper()
+            serving_size = rng.choice([28, 30, 55, 85, 100, 125, 170, 240])
+            serving_size_unit = 'ml' if category == 'Fruit & Vegetable Juice' else 'g'
+            publication_date = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+            writers['food.csv'].writerow([fdc_id, 'branded_food', description, '', publication_date, 'United States'])
+            writers['branded_food.csv'].writerow([
+                fdc_id, brand_owner, brand_name, '', f"{fdc_id:012d}",
+                f"{product.upper()}, WATER, SALT, NATURAL FLAVOR.", serving_size,
+                serving_size_unit, f"1 serving ({serving_size} {serving_size_unit})",
+                category, 'LI', '', publication_date, publication_date, 'United States', ''
+            ])
+
+            # Every label carries the required nutrients plus a random subset of the rest
+            nutrients = NUTRIENTS[:REQUIRED_NUTRIENT_COUNT] + rng.sample(optional_nutrients, rng.randint(0, len(optional_nutrients)))
+            for nutrient_id, _, _, _, typical_amount in nutrients:
+                if nutrient_row_id > nutrient_rows:
+                    break
+                amount = round(rng.uniform(0, 2 * typical_amount), 2)
+                writers['food_nutrient.csv'].writerow([nutrient_row_id, fdc_id, nutrient_id, amount])
+                nutrient_row_id += 1
+
+            if rng.random() < ATTRIBUTE_RATE:
+                for seq_num, (type_id, name, values) in enumerate(rng.sample(FOOD_ATTRIBUTES, rng.randint(1, 2)), start=1):
+                    writers['food_attribute.csv'].writerow([attribute_row_id, fdc_id, seq_num, type_id, name, rng.choice(values)])
+                    attribute_row_id += 1
+    finally:
+        for f in files.values():
+            f.close()
+
+    return food_count
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic USDA FoodData Central CSV files")
+    parser.add_argument('--nutrient-rows', type=int, default=100000, help="number of food_nutrient rows (1000 to 50000000)")
+    parser.add_argument('--output', default=SOURCE_DATA_PATH, help="directory to write the CSV files to")
+    parser.add_argument('--seed', type=int, default=0, help="random seed, so runs are reproducible")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    food_count = generate(args.output, args.nutrient_rows, args.seed)
+    print(f"Generated {food_count} foods and {args.nutrient_rows} nutrient rows in {args.output} "
+          f"in {time.time() - start_time:.2f} seconds")
+
+if __name__ == '__main__':
+    main()
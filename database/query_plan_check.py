@@ -0,0 +1,162 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import time
+
+from query_examples import EXAMPLE_QUERIES
+
+# The application queries live in the project root
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from grocery_list import BRANDED_FOOD_QUERY  # noqa: E402
+from temp import build_sample_query  # noqa: E402
+
+# Define the SQLite database file and the baseline of recorded query plans
+DATABASE_FILE = 'food_data.db'
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'query_plan_baseline.json')
+
+# Tables with at least this many rows count as large; scanning them fails the check
+LARGE_TABLE_ROWS = int(os.getenv('LARGE_TABLE_ROWS', '10000'))
+# Maximum median execution time allowed for any registered query
+LATENCY_BUDGET_SECONDS = float(os.getenv('LATENCY_BUDGET_SECONDS', '1.0'))
+# Queries the baseline already records as slower than the budget may take up
+# to this many times their baseline time
+LATENCY_REGRESSION_FACTOR = float(os.getenv('LATENCY_REGRESSION_FACTOR', '3.0'))
+# Number of timed executions per query
+TIMED_RUNS = int(os.getenv('TIMED_RUNS', '3'))
+
+# Matches the scanned table or alias in an EXPLAIN QUERY PLAN detail, in both
+# the old ("SCAN TABLE food AS f") and new ("SCAN f") SQLite formats
+SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?")
+# Matches searches through an index SQLite builds on the fly because none
+# exists ("SEARCH fn USING AUTOMATIC COVERING INDEX (fdc_id=?)"). Building it
+# reads the whole table on every execution, so it counts as a full scan.
+AUTOMATIC_INDEX_PATTERN = re.compile(r"^SEARCH (?:TABLE )?(\w+)(?: AS (\w+))? USING AUTOMATIC (?:PARTIAL )?(?:COVERING )?INDEX")
+# Matches table references and their aliases in FROM and JOIN clauses
+TABLE_REFERENCE_PATTERN = re.compile(r"(?:FROM|JOIN)\s+'?(\w+)'?(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|CROSS\b|LIMIT\b|GROUP\b|ORDER\b)(\w+))?", re.IGNORECASE)
+
+def get_registered_queries(conn):
+    """Return every query the project runs against the database as (name, sql, params) tuples"""
+    queries = [('expand_item_info', BRANDED_FOOD_QUERY, ('Dannon',))]
+
+    for number, (title, query) in enumerate(EXAMPLE_QUERIES, start=1):
+        queries.append((f"query_examples_{number}", query, ()))
+
+    # temp.py builds its sample queries from the columns of each table
+    for table_name in ['branded_food', 'food']:
+        column_names = [column[1] for column in conn.execute(f"PRAGMA table_info('{table_name}');")]
+        query, params = build_sample_query(table_name, column_names, limit=10, search_term='milk')
+        queries.append((f"print_sample_data_{table_name}", query, tuple(params)))
+
+    return queries
+
+def get_table_sizes(conn):
+    """Return the approximate row count of every table, using the largest rowid"""
+    sizes = {}
+    tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table';").fetchall()
+    for (table_name,) in tables:
+        sizes[table_name] = conn.execute(f"SELECT MAX(rowid) FROM '{table_name}';").fetchone()[0] or 0
+    return sizes
+
+def find_large_scans(query, plan, table_sizes):
+    """Return the large tables that a query plan scans in full or builds an automatic index over"""
+    # Resolve aliases used in the query back to their table names
+    aliases = {}
+    for table_name, alias in TABLE_REFERENCE_PATTERN.findall(query):
+        aliases[table_name] = table_name
+        if alias:
+            aliases[alias] = table_name
+
+    large_scans = set()
+    for detail in plan:
+        scan_match = SCAN_PATTERN.match(detail) or AUTOMATIC_INDEX_PATTERN.match(detail)
+        if not scan_match:
+            continue
+        table_name = aliases.get(scan_match.group(1), scan_match.group(1))
+        if table_sizes.get(table_name, 0) >= LARGE_TABLE_ROWS:
+            large_scans.add(table_name)
+    return sorted(large_scans)
+
+def check_query(conn, name, query, params, table_sizes):
+    """Explain and time a query, returning its plan, large table scans and median latency"""
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+    timings = []
+    for _ in range(TIMED_RUNS):
+        start_time = time.perf_counter()
+        conn.execute(query, params).fetchall()
+        timings.append(time.perf_counter() - start_time)
+
+    return {
+        'plan': plan,
+        'large_scans': find_large_scans(query, plan, table_sizes),
+        'seconds': round(statistics.median(timings), 6)
+    }
+
+def load_baseline():
+    """Load the recorded query plans, or an empty baseline if none exists yet"""
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE) as f:
+        return json.load(f)
+
+def save_baseline(results):
+    """Record the current query plans and timings as the new baseline"""
+    with open(BASELINE_FILE, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Saved query plan baseline to {BASELINE_FILE}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the project's SQL for full scans and slow queries")
+    parser.add_argument('database_file', nargs='?', default=DATABASE_FILE)
+    parser.add_argument('--update-baseline', action='store_true', help="record the current plans as the baseline")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.database_file):
+        print(f"Database {args.database_file} does not exist.")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.database_file)
+    table_sizes = get_table_sizes(conn)
+    baseline = load_baseline()
+
+    results = {}
+    failures = []
+    for name, query, params in get_registered_queries(conn):
+        result = check_query(conn, name, query, params, table_sizes)
+        results[name] = result
+        print(f"\n{name}: {result['seconds'] * 1000:.1f} ms")
+        for detail in result['plan']:
+            print(f"    {detail}")
+
+        # A large scan only fails if the baseline did not already accept it
+        accepted_scans = baseline.get(name, {}).get('large_scans', [])
+        for table_name in result['large_scans']:
+            if table_name not in accepted_scans:
+                failures.append(f"{name} scans large table {table_name} ({table_sizes[table_name]} rows)")
+        budget = max(LATENCY_BUDGET_SECONDS, baseline.get(name, {}).get('seconds', 0) * LATENCY_REGRESSION_FACTOR)
+        if result['seconds'] > budget:
+            failures.append(f"{name} took {result['seconds']:.3f}s (budget {budget:.3f}s)")
+
+    conn.close()
+
+    print("\n" + "=" * 79)
+    if args.update_baseline:
+        # Make it visible which full scans the new baseline accepts
+        for failure in failures:
+            print(f"ACCEPTED: {failure}")
+        save_baseline(results)
+    elif failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    else:
+        print("All registered queries match the baseline plans and latency budget.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+class EnrichmentCache:
+    """Bounded LRU cache of branded food lookups, shared between threads.
+
+    Misses are cached as well as hits, so brands that are not in the
+    database are only looked up once. The whole cache is cleared when the
+    database file changes on disk.
+    """
+
+    def __init__(self, max_size, database_path):
+        self.max_size = max_size
+        self.database_path = database_path
+        self.entries = OrderedDict()
+        self.database_signature = self._database_signature()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _database_signature(self):
+        # Modification time and size identify the current database file
+        try:
+            stat = os.stat(self.database_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _check_database(self):
+        # Drop every entry if the database has been rebuilt or replaced
+        signature = self._database_signature()
+        if signature != self.database_signature:
+            self.entries.clear()
+            self.database_signature = signature
+
+    def get(self, key):
+        """Return (found, value) for a key; value is None for a cached miss"""
+        with self.lock:
+            self._check_database()
+            if key not in self.entries:
+                self.misses += 1
+                return False, None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, self.entries[key]
+
+    def put(self, key, value):
+        """Cache a lookup result, where None records that nothing was found"""
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def memory_usage(self):
+        """Approximate memory used by the cached keys and values, in bytes"""
+        with self.lock:
+            total = sys.getsizeof(self.entries)
+            for key, value in self.entries.items():
+                total += sys.getsizeof(key) + sys.getsizeof(value)
+                if value is not None:
+                    total += sum(sys.getsizeof(field) for field in value)
+            return total
+
+    def stats(self):
+        """Return the cache hit rate and size, for logging"""
+        memory_usage = self.memory_usage()
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'entries': len(self.entries),
+                'negative_entries': sum(1 for value in self.entries.values() if value is None),
+                'memory_bytes': memory_usage
+            }
@@ -0,0 +1,207 @@
+import itertools
+import threading
+import time
+from datetime import datetime
+
+def expiry_time(valid_to, latest):
+    """Return when a result with the given valid_to expires, and never later than latest"""
+    try:
+        return min(latest, datetime.fromisoformat(valid_to).timestamp())
+    except (TypeError, ValueError):
+        return latest
+
+class FlyerCache:
+    """Search results cache shared between postal codes that see the same flyers.
+
+    Neighbouring postal codes are usually served the same merchant flyers.
+    The cache learns this from the flyer IDs in each response. A postal code
+    starts in a group of its own, and joins another group once at least
+    min_matching_queries different queries have returned exactly the same
+    flyers for both, with no query disagreeing. Only unexpired entries are
+    compared. Results without flyer IDs (online merchants) say nothing about
+    location and are never used as evidence. After joining, the postal code
+    reuses the group's cached results for every query.
+
+    Entries expire when their earliest flyer does (or after ttl seconds). If
+    a postal code returns different flyers for a query its group has cached,
+    its flyers have rolled over or it never belonged, so it moves to a new
+    group of its own. The other members keep the old group, and a group left
+    without members is dropped. on_invalidate is called with the postal code
+    so other caches can drop what they hold for it.
+
+    At most max_entries entries are held. Past that, expired entries are
+    removed first, then the ones that expire soonest.
+    """
+
+    def __init__(self, ttl, min_matching_queries=3, max_entries=2000, on_invalidate=None):
+        self.ttl = ttl
+        self.min_matching_queries = min_matching_queries
+        self.max_entries = max_entries
+        self.on_invalidate = on_invalidate
+        self.group_ids = itertools.count(1)
+        # postal code -> group ID
+        self.groups = {}
+        # group ID -> postal codes in the group
+        self.members = {}
+        # group ID -> {query: (results, flyer IDs, expires_at)}
+        self.entries = {}
+        # query -> groups with an entry for it
+        self.query_groups = {}
+        self.size = 0
+        # postal code -> {group: set of queries with matching flyers}
+        self.evidence = {}
+        # postal code -> groups that returned different flyers for some query
+        self.rejected = {}
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, postal_code, query):
+        """Return the cached results for a query, or None on a miss"""
+        with self.lock:
+            group = self.groups.get(postal_code)
+            entry = self._entry(group, query, time.time())
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if len(self.members[group]) > 1:
+                self.shared_hits += 1
+            return entry[0]
+
+    def put(self, postal_code, query, results, flyer_ids):
+        """Cache fresh results for a query and learn which group the postal code belongs to"""
+        flyer_ids = frozenset(flyer_id for flyer_id in flyer_ids if flyer_id is not None)
+        invalidated = False
+        with self.lock:
+            now = time.time()
+            group = self.groups.get(postal_code)
+            if group is None:
+                group = self._move(postal_code, next(self.group_ids))
+
+            # Different flyers for a query the group has cached: move this postal code to a new group
+            known = self._entry(group, query, now)
+            if known is not None and known[1] != flyer_ids:
+                group = self._move(postal_code, next(self.group_ids))
+                invalidated = True
+
+            self._set_entry(group, query, (results, flyer_ids, self._expires_at(results)))
+
+            if flyer_ids and self.members[group] == {postal_code}:
+                self._learn_group(postal_code, group, query, flyer_ids, now)
+
+            if self.size > self.max_entries:
+                self._prune(now)
+
+        if invalidated and self.on_invalidate:
+            self.on_invalidate(postal_code)
+
+    def _entry(self, group, query, now):
+        # Return the group's entry for a query, removing it if it has expired
+        entry = self.entries.get(group, {}).get(query)
+        if entry is not None and entry[2] <= now:
+            self._remove_entry(group, query)
+            return None
+        return entry
+
+    def _set_entry(self, group, query, entry):
+        queries = self.entries.setdefault(group, {})
+        if query not in queries:
+            self.size += 1
+            self.query_groups.setdefault(query, set()).add(group)
+        queries[query] = entry
+
+    def _remove_entry(self, group, query):
+        queries = self.entries[group]
+        del queries[query]
+        self.size -= 1
+        if not queries:
+            del self.entries[group]
+        groups = self.query_groups[query]
+        groups.discard(group)
+        if not groups:
+            del self.query_groups[query]
+
+    def _move(self, postal_code, group):
+        # Move the postal code to a group and forget what it had learned. A
+        # group left without members is dropped with its entries.
+        old_group = self.groups.get(postal_code)
+        self.groups[postal_code] = group
+        self.members.setdefault(group, set()).add(postal_code)
+        if old_group is not None:
+            self.members[old_group].discard(postal_code)
+            if not self.members[old_group]:
+                del self.members[old_group]
+                for query in list(self.entries.get(old_group, {})):
+                    self._remove_entry(old_group, query)
+        self.evidence.pop(postal_code, None)
+        self.rejected.pop(postal_code, None)
+        return group
+
+    def _learn_group(self, postal_code, group, query, flyer_ids, now):
+        # Compare the flyers with every other group that has this query cached,
+        # and join a group once enough queries agree and none disagree
+        evidence = self.evidence.setdefault(postal_code, {})
+        rejected = self.rejected.setdefault(postal_code, set())
+        for other_group in list(self.query_groups.get(query, ())):
+            if other_group == group:
+                continue
+            entry = self._entry(other_group, query, now)
+            if entry is None or not entry[1]:
+                continue
+            if entry[1] == flyer_ids:
+                evidence.setdefault(other_group, set()).add(query)
+            else:
+                rejected.add(other_group)
+
+        # Groups that have since been dropped can no longer be joined
+        rejected &= self.members.keys()
+        for other_group in list(evidence):
+            if other_group not in self.members:
+                del evidence[other_group]
+
+        for other_group, queries in evidence.items():
+            if other_group in rejected or len(queries) < self.min_matching_queries:
+                continue
+            # Move over the results the other group does not have yet, then join it
+            for entry_query, entry in self.entries.get(group, {}).items():
+                if entry_query not in self.entries.get(other_group, {}):
+                    self._set_entry(other_group, entry_query, entry)
+            self._move(postal_code, other_group)
+            return
+
+    def _prune(self, now):
+        # Remove expired entries, then the ones that expire soonest, down to
+        # three quarters of the cap so pruning does not run on every put
+        target = self.max_entries * 3 // 4
+        expiring = sorted(
+            (entry[2], group, query)
+            for group, queries in self.entries.items()
+            for query, entry in queries.items()
+        )
+        for expires_at, group, query in expiring:
+            if expires_at > now and self.size <= target:
+                break
+            self._remove_entry(group, query)
+
+    def _expires_at(self, results):
+        # Results are valid until the first of their flyers ends, or the TTL passes
+        expires_at = time.time() + self.ttl
+        for item in results:
+            expires_at = expiry_time(item.valid_to, expires_at)
+        return expires_at
+
+    def stats(self):
+        """Return the cache hit counters, for logging"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'entries': self.size,
+                'postal_codes': len(self.groups),
+                'groups': len(self.members)
+            }
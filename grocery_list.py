@@ -1,22 +1,30 @@
-import requests
 import os
-from openai import OpenAI
 import json
 import sqlite3
-from dotenv import load_dotenv
 import logging
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
 from datetime import datetime
-from fuzzywuzzy import fuzz
 import re
 from urllib.parse import urlencode
 import sys
 
+from candidate_index import CandidateIndex
+from enrichment_cache import EnrichmentCache
+from flyer_cache import FlyerCache
+from rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+# Heavy third-party packages (openai, requests, fuzzywuzzy) are imported on
+# first use so that importing this module stays cheap for short-lived runs.
+from dotenv import load_dotenv
+
 # Load environment variables
 load_dotenv()
 
-# Initialize the OpenAI client using the API key from environment variables
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# The OpenAI client is created on first use by get_openai_client()
+_client = None
 
 # Set up logging with the log level from environment variables
 log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
@@ -27,9 +35,158 @@ DATABASE_PATH = os.getenv('DATABASE_PATH', './database/food_data.db')
 # Backend URL for searching items
 BACKEND_URL = os.getenv('BACKEND_URL', 'https://backflipp.wishabi.com/flipp/items/search')
 
+# Number of grocery items searched concurrently
+MAX_WORKERS = int(os.getenv('MAX_WORKERS', '4'))
+
+# Number of relaxed queries for an item that are searched in parallel
+SPECULATIVE_QUERIES = int(os.getenv('SPECULATIVE_QUERIES', '3'))
+# Number of matching candidates a query needs before looser queries are skipped
+MIN_MATCHED_CANDIDATES = int(os.getenv('MIN_MATCHED_CANDIDATES', '1'))
+
+# Client-side limits for each upstream, in requests per second and requests in flight.
+# The limiters back off below these when the upstream rate-limits or slows down.
+BACKEND_MAX_RATE = float(os.getenv('BACKEND_MAX_RATE', '10'))
+BACKEND_MAX_CONCURRENCY = int(os.getenv('BACKEND_MAX_CONCURRENCY', '8'))
+OPENAI_MAX_RATE = float(os.getenv('OPENAI_MAX_RATE', '2'))
+OPENAI_MAX_CONCURRENCY = int(os.getenv('OPENAI_MAX_CONCURRENCY', '2'))
+# Number of times a rate-limited or failed request is retried before giving up
+MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
+# Seconds to wait for a backend response, so a hung request cannot hold a limiter slot
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', '15'))
+
+# Maximum age in seconds of cached search results, shared between postal codes with the same flyers
+FLYER_CACHE_TTL = float(os.getenv('FLYER_CACHE_TTL', '21600'))
+# Number of queries that must return the same flyers before two postal codes share results
+FLYER_GROUP_MIN_QUERIES = int(os.getenv('FLYER_GROUP_MIN_QUERIES', '3'))
+# Maximum number of query results held in the flyer cache
+FLYER_CACHE_MAX_ENTRIES = int(os.getenv('FLYER_CACHE_MAX_ENTRIES', '2000'))
+
+# Maximum number of candidates held per postal code in the candidate index
+CANDIDATE_INDEX_MAX_CANDIDATES = int(os.getenv('CANDIDATE_INDEX_MAX_CANDIDATES', '5000'))
+# Maximum number of postal codes held in the candidate index
+CANDIDATE_INDEX_MAX_POSTAL_CODES = int(os.getenv('CANDIDATE_INDEX_MAX_POSTAL_CODES', '100'))
+
+# Maximum number of brands kept in the enrichment cache
+ENRICHMENT_CACHE_SIZE = int(os.getenv('ENRICHMENT_CACHE_SIZE', '1024'))
+
 # Debug mode
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
 
+# Rate limiters shared by every GroceryPriceFinder in the process
+backend_limiter = AdaptiveRateLimiter('backend', BACKEND_MAX_RATE, BACKEND_MAX_CONCURRENCY)
+openai_limiter = AdaptiveRateLimiter('openai', OPENAI_MAX_RATE, OPENAI_MAX_CONCURRENCY)
+
+# Candidates fetched so far in the session, indexed by postal code and name token
+candidate_index = CandidateIndex(FLYER_CACHE_TTL, CANDIDATE_INDEX_MAX_CANDIDATES, CANDIDATE_INDEX_MAX_POSTAL_CODES)
+
+# Search results cache shared by every GroceryPriceFinder in the process. A
+# postal code whose flyers roll over loses its indexed candidates too.
+flyer_cache = FlyerCache(FLYER_CACHE_TTL, FLYER_GROUP_MIN_QUERIES, FLYER_CACHE_MAX_ENTRIES,
+                         on_invalidate=candidate_index.drop)
+
+# Branded food lookups shared by every GroceryPriceFinder in the process
+enrichment_cache = EnrichmentCache(ENRICHMENT_CACHE_SIZE, DATABASE_PATH)
+
+# Speculative searches shared by every GroceryPriceFinder in the process. They
+# run on their own pool so item workers never wait on their own threads.
+search_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS * SPECULATIVE_QUERIES, thread_name_prefix='search')
+
+def get_openai_client():
+    # Create the OpenAI client on first use and reuse it afterwards.
+    # Retries are left to create_chat_completion() so rate limits reach openai_limiter.
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    return _client
+
+def create_chat_completion(**kwargs):
+    # Call the OpenAI chat completions API through the shared rate limiter,
+    # retrying rate limits, connection errors and server errors
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+
+    client = get_openai_client()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            with openai_limiter.request() as report_throttled:
+                try:
+                    return client.chat.completions.create(**kwargs)
+                except RateLimitError as e:
+                    report_throttled(parse_retry_after(e.response.headers.get('retry-after')))
+                    error = e
+        except (APIConnectionError, InternalServerError) as e:
+            # The limiter has already recorded the failure; back off before retrying
+            error = e
+            if attempt < MAX_RETRIES:
+                time.sleep(2 ** attempt)
+        if attempt == MAX_RETRIES:
+            raise error
+        logging.warning(f"OpenAI request failed ({type(error).__name__}), retrying (attempt {attempt + 1} of {MAX_RETRIES})")
+
+def get_with_rate_limit(url):
+    # Send a GET request to the backend through the shared rate limiter,
+    # retrying rate limits, connection errors, timeouts and server errors
+    import requests
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            with backend_limiter.request() as report_throttled:
+                response = requests.get(url, timeout=REQUEST_TIMEOUT)
+                if response.status_code >= 500:
+                    # Raise inside the block so the limiter records the failure
+                    response.raise_for_status()
+                if response.status_code != 429:
+                    return response
+                report_throttled(parse_retry_after(response.headers.get('Retry-After')))
+                error = None
+        except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+            # The limiter has already recorded the failure; back off before retrying
+            error = e
+            if attempt < MAX_RETRIES:
+                time.sleep(2 ** attempt)
+        if attempt == MAX_RETRIES:
+            if error is not None:
+                raise error
+            return response
+        reason = type(error).__name__ if error is not None else 'rate limited'
+        logging.warning(f"Backend request failed ({reason}), retrying (attempt {attempt + 1} of {MAX_RETRIES})")
+
+# Query used to expand item information from the branded food tables
+BRANDED_FOOD_QUERY = """
+SELECT bf.brand_owner, bf.ingredients, bf.serving_size, bf.serving_size_unit, f.description
+FROM branded_food AS bf
+JOIN food AS f ON bf.fdc_id = f.fdc_id
+WHERE LOWER(bf.brand_owner) LIKE '%' || LOWER(?) || '%'
+LIMIT 1;
+"""
+
+# Number of non-matching item names kept as alternatives for each search
+MAX_ALTERNATIVES = 5
+
+# Number of candidates kept from each section of a backend response. The backend
+# ranks results by relevance, so matches for the query sit at the top of each
+# section; the long tail is dropped instead of being carried through the caches.
+MAX_CANDIDATES_PER_SECTION = int(os.getenv('MAX_CANDIDATES_PER_SECTION', '100'))
+
+# Sections of the backend response that contain candidate items
+RESPONSE_ITEM_SECTIONS = ('items', 'ecom_items', 'related_items')
+
+class Candidate:
+    # Compact record for a backend search result, holding only the fields
+    # needed to pick the cheapest item and the flyer it came from. Price and
+    # size are parsed once when the record is created.
+    __slots__ = ('name', 'merchant', 'price', 'size', 'unit', 'valid_to', 'image', 'flyer_id')
+
+    def __init__(self, name, merchant, price, size, unit, valid_to, image, flyer_id=None):
+        self.name = name
+        self.merchant = merchant
+        self.price = price
+        self.size = size
+        self.unit = unit
+        self.valid_to = valid_to
+        self.image = image
+        self.flyer_id = flyer_id
+
 class GroceryPriceFinder:
     def __init__(self, zip_code, grocery_list):
         self.zip_code = zip_code
@@ -37,6 +194,8 @@ class GroceryPriceFinder:
         self.grocery_items = []
         self.available_stores = set()
         self.store_item_counts = Counter()
+        # Items are searched from worker threads, so shared counters need a lock
+        self.lock = threading.Lock()
 
         # Create necessary directories for storing response data
         os.makedirs("responses", exist_ok=True)
@@ -53,7 +212,7 @@ class GroceryPriceFinder:
 
     def parse_grocery_list(self):
         # Use OpenAI to parse the grocery list into structured data
-        response = client.chat.completions.create(
+        response = create_chat_completion(
             model="gpt-4o-mini",  # Don't change this, it's correct.
             messages=[
                 {"role": "system", "content": "You are a helpful assistant that parses grocery lists into structured data with categories."},
@@ -97,25 +256,32 @@ class GroceryPriceFinder:
             logging.error("Error: Unexpected response format from OpenAI")
             return []
 
-    def expand_item_info(self, item):
-        # Expand item information by querying the database
+    def lookup_branded_food(self, brand):
+        # Look up branded food info for a brand, going through the shared
+        # enrichment cache so each brand is only queried once
+        normalized_brand = brand.strip().lower()
+        found, result_branded = enrichment_cache.get(normalized_brand)
+        if found:
+            return result_branded
+
         conn = self.connect_db()
         if not conn:
-            return item
+            return None
 
         cursor = conn.cursor()
+        cursor.execute(BRANDED_FOOD_QUERY, (normalized_brand,))
+        result_branded = cursor.fetchone()
+        conn.close()
+
+        # Misses are cached too, so unknown brands are not queried again
+        enrichment_cache.put(normalized_brand, result_branded)
+        return result_branded
 
+    def expand_item_info(self, item):
+        # Expand item information by querying the database
         # Only use the database for additional info if a brand is specified
         if item.get('brand'):
-            query_branded = """
-            SELECT bf.brand_owner, bf.ingredients, bf.serving_size, bf.serving_size_unit, f.description
-            FROM branded_food AS bf
-            JOIN food AS f ON bf.fdc_id = f.fdc_id
-            WHERE LOWER(bf.brand_owner) LIKE '%' || LOWER(?) || '%'
-            LIMIT 1;
-            """
-            cursor.execute(query_branded, (item['brand'],))
-            result_branded = cursor.fetchone()
+            result_branded = self.lookup_branded_food(item['brand'])
 
             # If a result is found, update the item with additional information
             if result_branded:
@@ -130,7 +296,6 @@ class GroceryPriceFinder:
         else:
             logging.debug(f"No brand specified for '{item['name']}', skipping database lookup")
 
-        conn.close()
         return item
 
     def build_query_for_item(self, item):
@@ -157,14 +322,87 @@ class GroceryPriceFinder:
         logging.debug(f"Built query for '{item['name']}': {query}")
         return query.strip()
 
+    def build_relaxed_queries(self, item):
+        # Build progressively looser search queries for the item, starting
+        # with the full query and ending with the bare item name
+        brand = item.get('brand')
+        name = item['name']
+        item_type = item.get('type')
+
+        candidates = [
+            self.build_query_for_item(item),
+            ' '.join(part for part in [brand, name, item_type] if part),
+            ' '.join(part for part in [brand, name] if part),
+            ' '.join(part for part in [name, item_type] if part),
+            name
+        ]
+
+        # Drop duplicates while keeping the ranking
+        queries = []
+        for query in candidates:
+            query = query.strip()
+            if query and query not in queries:
+                queries.append(query)
+        return queries
+
+    def count_matches(self, items, original_item):
+        # Count the candidates that match the original item
+        return sum(1 for item in items if self.item_matches(item, original_item))
+
+    def search_with_relaxation(self, item):
+        # Search the relaxed queries a batch at a time, with each batch in
+        # parallel, and return the tightest query whose results contain
+        # enough matches. Pending searches are cancelled once one is chosen.
+        queries = self.build_relaxed_queries(item)
+        best_query, best_results, best_matches = queries[0], [], -1
+
+        # The full query may already be covered by a more general one fetched
+        # for this postal code. Relaxed queries always go to the backend.
+        local_items = candidate_index.lookup(self.zip_code, queries[0])
+        if local_items is not None:
+            matches = self.count_matches(local_items, item)
+            if matches >= MIN_MATCHED_CANDIDATES:
+                logging.info(f"Answered query '{queries[0]}' for '{item['name']}' locally ({matches} matches)")
+                return queries[0], local_items
+
+        for start in range(0, len(queries), SPECULATIVE_QUERIES):
+            batch = queries[start:start + SPECULATIVE_QUERIES]
+            futures = [search_executor.submit(self.search_item, query) for query in batch]
+            try:
+                # Check results in ranking order so tighter queries win
+                for query, future in zip(batch, futures):
+                    results = future.result()
+                    matches = self.count_matches(results, item)
+                    if matches > best_matches:
+                        best_query, best_results, best_matches = query, results, matches
+                    if matches >= MIN_MATCHED_CANDIDATES:
+                        logging.info(f"Using query '{query}' for '{item['name']}' ({matches} matches)")
+                        return query, results
+                    logging.debug(f"Query '{query}' had {matches} matches, relaxing")
+            finally:
+                for future in futures:
+                    future.cancel()
+
+        return best_query, best_results
+
     def search_item(self, query):
         # Search for the item using the backend API
+        import requests
+
+        # Reuse results fetched for this postal code or one with the same flyers
+        cached_items = flyer_cache.get(self.zip_code, query)
+        if cached_items is not None:
+            logging.info(f"Using cached results for query: {query}")
+            candidate_index.add(self.zip_code, query, cached_items)
+            return cached_items
+
         try:
+            start_time = time.monotonic()
             params = {'q': query, 'postal_code': self.zip_code}
             url = f"{BACKEND_URL}?{urlencode(params)}"
             logging.info(f"Searching URL: {url}")
 
-            response = requests.get(url)
+            response = get_with_rate_limit(url)
             response.raise_for_status()
 
             try:
@@ -176,30 +414,60 @@ class GroceryPriceFinder:
                 logging.error(f"Response content: {response.text}")
                 return []
 
-            # Extract items from the response
-            items = data.get('items', []) + data.get('ecom_items', []) + data.get('related_items', [])
+            # Convert the response into compact candidate records
+            items = list(self.parse_candidates(data))
             logging.info(f"Found {len(items)} items for query: {query}")
-
-            # Initialize a set to store all detected stores
-            stores = set()
-
-            # Process each item and extract the store name
-            for item in items:
-                store_name = item.get('merchant') or item.get('merchant_name') or 'Unknown Store'
-                store_name = store_name.strip()
-                normalized_store_name = store_name.lower()  # Normalize for consistency
-
-                # Add the normalized store name to the set
-                stores.add(normalized_store_name)
-
-                # Update the store item counts with the raw (non-normalized) store name
-                self.store_item_counts[store_name] += 1
+            flyer_cache.put(self.zip_code, query, items, [item.flyer_id for item in items])
+            candidate_index.add(self.zip_code, query, items, time.monotonic() - start_time)
 
             return items
         except requests.RequestException as e:
             logging.error(f"Error searching for item {query}: {e}")
             return []
 
+    def parse_candidates(self, data):
+        # Yield a Candidate for each usable item in the backend response,
+        # dropping records without a valid name as they are read and keeping
+        # at most MAX_CANDIDATES_PER_SECTION from each section
+        for section in RESPONSE_ITEM_SECTIONS:
+            kept = 0
+            for item in data.get(section) or []:
+                if kept >= MAX_CANDIDATES_PER_SECTION:
+                    logging.debug(f"Keeping the first {kept} items from '{section}'")
+                    break
+                if not isinstance(item, dict):
+                    logging.debug(f"Skipping non-dict item: {type(item)}")
+                    continue
+                if not isinstance(item.get('name'), str):
+                    logging.debug(f"Skipping item without valid name: {item}")
+                    continue
+
+                store_name = item.get('merchant') or item.get('merchant_name') or 'Unknown Store'
+
+                # Update the store item counts with the raw (non-normalized) store name
+                with self.lock:
+                    self.store_item_counts[store_name.strip()] += 1
+
+                try:
+                    price = self.parse_price(item)
+                except (TypeError, ValueError):
+                    logging.debug(f"Invalid price for item: {item['name']}")
+                    price = None
+                size_data = self.parse_unit_size(item)
+
+                kept += 1
+                yield Candidate(
+                    name=item['name'],
+                    merchant=store_name,
+                    price=price,
+                    size=size_data['size'],
+                    unit=size_data['unit'],
+                    valid_to=item.get('valid_to') or 'N/A',
+                    image=item.get('image_url') or 'N/A',
+                    # Online items have no flyer and carry None
+                    flyer_id=item.get('flyer_id')
+                )
+
     def parse_price(self, item):
         # Parse the price from the item data
         if item is None:
@@ -252,15 +520,11 @@ class GroceryPriceFinder:
         return price / size_in_oz if size_in_oz else None
 
     def item_matches(self, item, original_item):
-        # Check if an item matches the original based on name and brand
-        if item is None or not isinstance(item, dict):
-            return False
-
-        item_name = item.get('name')
-        if not isinstance(item_name, str):
+        # Check if a candidate matches the original based on name and brand
+        if item is None:
             return False
 
-        item_name = item_name.lower()
+        item_name = item.name.lower()
         original_name = original_item['name'].lower()
 
         # If a brand is specified, ensure it matches
@@ -269,70 +533,58 @@ class GroceryPriceFinder:
                 return False
 
         # Use fuzzy matching to compare item names
+        from fuzzywuzzy import fuzz
         ratio = fuzz.partial_ratio(original_name, item_name)
 
         return ratio >= 70  # Threshold for considering a match
 
     def find_cheapest_item(self, items, original_item, query, revised_query):
-        # Find the cheapest matching item from the list of items
+        # Find the cheapest matching item from the list of candidates
         logging.debug(f"Finding cheapest item for: {original_item['name']}")
         cheapest_item = None
         lowest_normalized_price = float('inf')
         stores_searched = set()
         items_matched = 0
-        alternatives = set()
+        # Insertion-ordered set of alternative names
+        alternatives = {}
 
         for item in items:
-            if item is None:
-                logging.debug("Skipping None item")
-                continue
-
-            if not isinstance(item, dict):
-                logging.debug(f"Skipping non-dict item: {type(item)}")
-                continue
-
-            if 'name' not in item or not isinstance(item['name'], str):
-                logging.debug(f"Skipping item without valid name: {item}")
-                continue
-
-            store_name = item.get('merchant') or item.get('merchant_name', 'Unknown Store')
+            store_name = item.merchant
             stores_searched.add(store_name)
 
             # Check if the item matches the intended item
             if self.item_matches(item, original_item):
                 items_matched += 1
             else:
-                alternatives.add(item['name'])  # Add the full name as an alternative
-                logging.debug(f"Item does not match: {item.get('name', 'No name')}")
+                # Keep the first few full names as alternatives
+                if len(alternatives) < MAX_ALTERNATIVES:
+                    alternatives[item.name] = None
+                logging.debug(f"Item does not match: {item.name}")
                 continue
 
-            # Parse the price of the item
-            price = self.parse_price(item)
-            if price is None:
-                logging.debug(f"No price found for item: {item.get('name', 'No name')}")
+            if item.price is None:
+                logging.debug(f"No price found for item: {item.name}")
                 continue
 
-            # Parse the unit size of the item
-            size_data = self.parse_unit_size(item)
             # Normalize the price per unit size
-            normalized_price = self.normalize_price(price, size_data['size'], size_data['unit'])
+            normalized_price = self.normalize_price(item.price, item.size, item.unit)
 
             # Check if the brand matches if specified
-            if original_item.get('brand') and original_item['brand'].lower() not in item.get('name', '').lower():
-                logging.debug(f"Brand mismatch for item: {item.get('name', 'No name')}")
+            if original_item.get('brand') and original_item['brand'].lower() not in item.name.lower():
+                logging.debug(f"Brand mismatch for item: {item.name}")
                 continue
 
             # Update the cheapest item if a lower price is found
             if normalized_price is not None and normalized_price < lowest_normalized_price:
                 lowest_normalized_price = normalized_price
                 cheapest_item = {
-                    'name': item.get('name', original_item['name']),
-                    'image': item.get('image_url', 'N/A'),
-                    'price': price,
-                    'size': f"{size_data['size']} {size_data['unit']}",
+                    'name': item.name,
+                    'image': item.image,
+                    'price': item.price,
+                    'size': f"{item.size} {item.unit}",
                     'normalized_price': normalized_price,
                     'store': store_name,
-                    'valid_until': item.get('valid_to', 'N/A'),
+                    'valid_until': item.valid_to,
                     'original_query': query,
                     'revised_query': revised_query,
                     'stores_searched': list(stores_searched),
@@ -361,60 +613,104 @@ class GroceryPriceFinder:
 
         return cheapest_item
 
+    def process_item(self, item):
+        # Find the cheapest match for a single parsed grocery item
+        logging.info(f"Processing item: {item['name']}")
+        # Expand item information using the database
+        expanded_item = self.expand_item_info(item)
+        # Search with progressively looser queries and find the cheapest match
+        original_query = item['name']
+        revised_query, results = self.search_with_relaxation(expanded_item)
+        cheapest_item = self.find_cheapest_item(results, expanded_item, original_query, revised_query)
+
+        if DEBUG:
+            logging.debug(f"Cheapest item for {item['name']}: {cheapest_item['store']} - ${cheapest_item['price']}")
+
+        return cheapest_item
+
+    def iter_cheapest_items(self):
+        # Yield (index, cheapest_item) pairs as soon as each item finishes.
+        # Items are searched concurrently, so results arrive in completion
+        # order; the index is the item's position in the parsed grocery list.
+        parsed_list = self.parse_grocery_list()
+        start_time = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        try:
+            futures = {executor.submit(self.process_item, item): index for index, item in enumerate(parsed_list)}
+            for completed, future in enumerate(as_completed(futures)):
+                cheapest_item = future.result()
+                if completed == 0:
+                    logging.info(f"Time to first result: {time.monotonic() - start_time:.2f} seconds")
+                # Track the stores where items were found
+                if cheapest_item['store'] not in ['Unknown Store', 'None']:
+                    self.available_stores.add(cheapest_item['store'])
+                yield futures[future], cheapest_item
+        finally:
+            # Stop any pending searches if the caller stops iterating early
+            executor.shutdown(wait=True, cancel_futures=True)
+            logging.debug(f"Rate limiter stats: {backend_limiter.stats()}, {openai_limiter.stats()}")
+            logging.debug(f"Flyer cache stats: {flyer_cache.stats()}")
+            logging.debug(f"Enrichment cache stats: {enrichment_cache.stats()}")
+            logging.info(f"Candidate index stats: {candidate_index.stats()}")
+
     def process_grocery_list(self):
         # Process the entire grocery list to find the cheapest items
-        parsed_list = self.parse_grocery_list()
-        for item in parsed_list:
-            logging.info(f"Processing item: {item['name']}")
-            # Expand item information using the database
-            expanded_item = self.expand_item_info(item)
-            # Build the original and revised queries
-            original_query = item['name']
-            revised_query = self.build_query_for_item(expanded_item)
-            # Search for items and find the cheapest match
-            results = self.search_item(revised_query)
-            cheapest_item = self.find_cheapest_item(results, expanded_item, original_query, revised_query)
-            self.grocery_items.append(cheapest_item)
-            # Track the stores where items were found
-            if cheapest_item['store'] not in ['Unknown Store', 'None']:
-                self.available_stores.add(cheapest_item['store'])
-
-            if DEBUG:
-                logging.debug(f"Cheapest item for {item['name']}: {cheapest_item['store']} - ${cheapest_item['price']}")
+        results = dict(self.iter_cheapest_items())
+        self.grocery_items = [results[index] for index in sorted(results)]
 
-    def print_grocery_items(self):
-        # Print the results for all items in the grocery list
+    def print_results_header(self):
         print("\n" + "=" * 30 + "  SEARCH RESULTS  " + "=" * 30 + "\n")
 
-        for item in self.grocery_items:
-            print(f"[Search] {item['original_query'].title()} ({item['items_matched']} Results)")
-            print(f"    Revised Search: {item['revised_query']}")
-
-            if item['store'] != 'None':
-                # Print details of the matched item
-                print(f"    Matched Item: {item['name']}")
-                print(f"    Local Stores Searched: {', '.join(item['stores_searched'])}")
-                print(f"    --> Store Selected: {item['store']}")
-                print(f"    --> Price: {'$' + format(item['price'], '.2f') if item['price'] else 'N/A'}")
-                print(f"    --> Size: {item['size']}")
-                print(f"    --> Normalized Price: {'$' + format(item['normalized_price'], '.2f') + ' per oz' if item['normalized_price'] else 'N/A'}")
-                if item['valid_until'] != 'N/A':
-                    valid_until = datetime.strptime(item['valid_until'][:10], "%Y-%m-%d").strftime("%Y-%m-%d")
-                    print(f"    --> Valid Until: {valid_until}")
-            else:
-                # Print message if no item was matched
-                print("    Matched Item: None")
-                print(f"    Local Stores Searched: {', '.join(item['stores_searched']) if item['stores_searched'] else 'None'}")
-                print("    --> Message: No valid items found.")
+    def print_results_footer(self):
+        print("=" * 79)
+
+    def print_grocery_item(self, item):
+        # Print the result for a single item in the grocery list
+        print(f"[Search] {item['original_query'].title()} ({item['items_matched']} Results)")
+        print(f"    Revised Search: {item['revised_query']}")
+
+        if item['store'] != 'None':
+            # Print details of the matched item
+            print(f"    Matched Item: {item['name']}")
+            print(f"    Local Stores Searched: {', '.join(item['stores_searched'])}")
+            print(f"    --> Store Selected: {item['store']}")
+            print(f"    --> Price: {'$' + format(item['price'], '.2f') if item['price'] else 'N/A'}")
+            print(f"    --> Size: {item['size']}")
+            print(f"    --> Normalized Price: {'$' + format(item['normalized_price'], '.2f') + ' per oz' if item['normalized_price'] else 'N/A'}")
+            if item['valid_until'] != 'N/A':
+                valid_until = datetime.strptime(item['valid_until'][:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+                print(f"    --> Valid Until: {valid_until}")
+        else:
+            # Print message if no item was matched
+            print("    Matched Item: None")
+            print(f"    Local Stores Searched: {', '.join(item['stores_searched']) if item['stores_searched'] else 'None'}")
+            print("    --> Message: No valid items found.")
 
-            # Print alternative items if available
-            if item['alternatives']:
-                top_5_alternatives = item['alternatives'][:5]
-                print(f"    Alternatives: {', '.join(top_5_alternatives)}")
+        # Print alternative items if available
+        if item['alternatives']:
+            top_5_alternatives = item['alternatives'][:5]
+            print(f"    Alternatives: {', '.join(top_5_alternatives)}")
 
-            print("\n" + "-" * 79 + "\n")
+        print("\n" + "-" * 79 + "\n")
 
-        print("=" * 79)
+    def print_grocery_items(self):
+        # Print the results for all items in the grocery list
+        self.print_results_header()
+        for item in self.grocery_items:
+            self.print_grocery_item(item)
+        self.print_results_footer()
+
+    def stream_grocery_items(self):
+        # Print each item's result as soon as it is ready, keeping the
+        # completed results in grocery list order in self.grocery_items
+        self.print_results_header()
+        results = {}
+        for index, item in self.iter_cheapest_items():
+            results[index] = item
+            self.print_grocery_item(item)
+            sys.stdout.flush()
+        self.grocery_items = [results[index] for index in sorted(results)]
+        self.print_results_footer()
 
     def save_json_response(self, query, data):
         # Save the API response data to a JSON file for debugging
@@ -455,5 +751,4 @@ if __name__ == "__main__":
 
     # Create an instance of GroceryPriceFinder and process the grocery list
     finder = GroceryPriceFinder(zip_code, grocery_list)
-    finder.process_grocery_list()
-    finder.print_grocery_items()
+    finder.stream_grocery_items()
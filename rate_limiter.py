@@ -0,0 +1,135 @@
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+# Pause applied after a rate-limit response that does not say how long to wait
+DEFAULT_RETRY_AFTER = 1.0
+
+def parse_retry_after(value):
+    """Parse a Retry-After header given either in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    # Dates with a "-0000" zone parse as naive datetimes; HTTP dates are always UTC
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class AdaptiveRateLimiter:
+    """Token bucket and concurrency limit for one upstream, adjusted AIMD-style.
+
+    Successful requests raise the request rate and concurrency additively,
+    rate-limit responses halve both and pause all callers for the Retry-After
+    period, and failed requests or responses slower than target_latency
+    shrink the concurrency.
+    Requests already in flight when the limits were last cut do not cut them
+    again, so a burst of rate-limit responses only backs off once.
+    """
+
+    def __init__(self, name, max_rate, max_concurrency, min_rate=0.2, target_latency=2.0):
+        self.name = name
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+
+        self.rate = max_rate
+        self.concurrency = float(max_concurrency)
+        self.tokens = 1.0
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.last_refill = time.monotonic()
+        self.requests = 0
+        self.throttled = 0
+        self.condition = threading.Condition()
+
+    def _refill(self, now):
+        # Add the tokens earned since the last refill, keeping at most one
+        # second's worth so an idle limiter cannot burst past the upstream
+        self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self):
+        """Block until a request may be sent to the upstream and return its start time"""
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    timeout = self.paused_until - now
+                elif self.in_flight >= int(self.concurrency):
+                    timeout = None
+                elif self.tokens < 1:
+                    timeout = (1 - self.tokens) / self.rate
+                else:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    self.requests += 1
+                    return now
+                self.condition.wait(timeout)
+
+    def release(self, started, throttled=False, retry_after=None, failed=False):
+        """Record the outcome of a request started at `started` and adjust the limits"""
+        with self.condition:
+            now = time.monotonic()
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                pause = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER
+                self.paused_until = max(self.paused_until, now + pause)
+                if started >= self.last_decrease:
+                    self.rate = max(self.min_rate, self.rate / 2)
+                    self.concurrency = max(1.0, self.concurrency / 2)
+                    self.last_decrease = now
+            elif failed or now - started > self.target_latency:
+                if started >= self.last_decrease:
+                    self.concurrency = max(1.0, self.concurrency * 0.9)
+                    self.last_decrease = now
+            else:
+                self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            self.condition.notify_all()
+
+    @contextmanager
+    def request(self):
+        """Hold a request slot for the duration of the block.
+
+        The block can call the yielded function with an optional Retry-After
+        value to report that the upstream rate-limited the request. An
+        exception raised out of the block counts as a failed request.
+        """
+        outcome = {'throttled': False, 'retry_after': None, 'failed': False}
+
+        def report_throttled(retry_after=None):
+            outcome['throttled'] = True
+            outcome['retry_after'] = retry_after
+
+        started = self.acquire()
+        try:
+            yield report_throttled
+        except BaseException:
+            outcome['failed'] = True
+            raise
+        finally:
+            self.release(started, outcome['throttled'], outcome['retry_after'], outcome['failed'])
+
+    def stats(self):
+        """Return the current limits and counters, for logging"""
+        with self.condition:
+            return {
+                'name': self.name,
+                'rate': round(self.rate, 2),
+                'concurrency': int(self.concurrency),
+                'requests': self.requests,
+                'throttled': self.throttled
+            }
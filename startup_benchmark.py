@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+# Maximum cumulative import time (in milliseconds) allowed for each module
+STARTUP_BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', '150'))
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules to measure, with the directory they must be imported from
+MODULES = {
+    'grocery_list': PROJECT_DIR,
+    'create_db': os.path.join(PROJECT_DIR, 'database'),
+}
+
+# Heavy packages that must not be loaded just by importing the modules above
+LAZY_PACKAGES = ['openai', 'requests', 'fuzzywuzzy', 'pandas']
+
+def measure_import(module, cwd):
+    """Import a module in a fresh interpreter with -X importtime and return the parsed timings"""
+    # Anything the module imports is reported on stderr, one line per import
+    code = f"import sys, {module}; print(','.join(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=cwd, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line.split(':', 1)[1].split('|')]
+        timings[name] = (int(self_us), int(cumulative_us))
+
+    loaded_modules = set(result.stdout.strip().split(','))
+    return timings, loaded_modules
+
+def check_module(module, cwd):
+    """Print the import timings for a module and return a list of budget violations"""
+    timings, loaded_modules = measure_import(module, cwd)
+    total_ms = timings[module][1] / 1000
+    print(f"\n{module}: {total_ms:.1f} ms cumulative (budget {STARTUP_BUDGET_MS:.0f} ms)")
+
+    # Show the slowest imports to make regressions easy to track down
+    others = [entry for entry in timings.items() if entry[0] != module]
+    slowest = sorted(others, key=lambda entry: entry[1][1], reverse=True)[:5]
+    for name, (_, cumulative_us) in slowest:
+        print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if total_ms > STARTUP_BUDGET_MS:
+        failures.append(f"{module} took {total_ms:.1f} ms to import")
+    for package in LAZY_PACKAGES:
+        if package in loaded_modules:
+            failures.append(f"{module} eagerly imports {package}")
+    return failures
+
+def main():
+    print("=" * 30 + "  STARTUP BENCHMARK  " + "=" * 28)
+
+    failures = []
+    for module, cwd in MODULES.items():
+        failures.extend(check_module(module, cwd))
+
+    print("\n" + "=" * 79)
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("All modules are within the startup budget.")
+
+if __name__ == '__main__':
+    main()
@@ -35,10 +35,7 @@ def print_table_schema(conn, table_name):
         print(f"{name} ({type_}){pk_text}")
     print("-" * 50)
 
-def print_sample_data(conn, table_name, limit=5, search_term=None):
-    cursor = conn.cursor()
-    column_names = get_column_names(conn, table_name)
-
+def build_sample_query(table_name, column_names, limit=5, search_term=None):
     # Determine the appropriate columns to search in
     search_columns = []
     if 'description' in column_names:
@@ -60,6 +57,13 @@ def print_sample_data(conn, table_name, limit=5, search_term=None):
         query = f"SELECT * FROM '{table_name}' LIMIT ?;"
         params = [limit]
 
+    return query, params
+
+def print_sample_data(conn, table_name, limit=5, search_term=None):
+    cursor = conn.cursor()
+    column_names = get_column_names(conn, table_name)
+    query, params = build_sample_query(table_name, column_names, limit, search_term)
+
     try:
         cursor.execute(query, params)
         rows = cursor.fetchall()